@@ -11,9 +11,8 @@ CREATE TABLE IF NOT EXISTS frases (
 -- =========================
 -- INDEXES
 -- =========================
-CREATE INDEX IF NOT EXISTS idx_categoria_principal ON frases (categoria_principal);
 CREATE INDEX IF NOT EXISTS idx_subcategoria ON frases (subcategoria);
-CREATE INDEX IF NOT EXISTS idx_categoria_subcategoria ON frases (categoria_principal, subcategoria);
+CREATE INDEX IF NOT EXISTS idx_frases_catsub ON frases (categoria_principal, subcategoria, ordem);
 
 -- =========================
 -- ATENDIMENTO GERAIS - INÍCIO
@@ -11,13 +11,65 @@ import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from hmac import compare_digest
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import urllib.parse
 import datetime
-from threading import Thread
+import gzip
+import hashlib
+import re
+import queue
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import itemgetter
+from threading import BoundedSemaphore, Condition, Thread, local
 
 # Flask imports for snippet server
-from flask import Flask, jsonify, request
+from flask import Blueprint, Flask, abort, request
+
+# orjson serializes straight to UTF-8 bytes and is much faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Optional MessagePack encoding for the snippet manager GUI
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    msgspec = None
+    MSGSPEC_AVAILABLE = False
+
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+
+# Optional gzip/brotli compression for the Flask app
+try:
+    from flask_compress import Compress
+    FLASK_COMPRESS_AVAILABLE = True
+except ImportError:
+    Compress = None
+    FLASK_COMPRESS_AVAILABLE = False
+
+# Optional Brotli body for the pre-compressed HTML interface (smaller than gzip)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Optional production WSGI server for the snippet app
+try:
+    import waitress
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    waitress = None
+    WAITRESS_AVAILABLE = False
+
+SNIPPET_SERVER_THREADS = 8
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -56,6 +108,13 @@ def configure_logging():
 logger = configure_logging()
 
 
+def dumps_json_bytes(data):
+    """Serialize data to compact UTF-8 JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
 def _admin_feature_enabled():
     value = os.environ.get("SNIPPET_ADMIN_ENABLED", "0").strip().lower()
     return value in {"1", "true", "yes", "on"}
@@ -72,31 +131,94 @@ def require_snippet_admin():
             "Blocked snippet modification attempt from %s because admin API is disabled.",
             request.remote_addr,
         )
-        return False, (jsonify({"error": "Snippet administration API is disabled"}), 403)
+        return False, json_response({"error": "Snippet administration API is disabled"}, 403)
 
     if not SNIPPET_ADMIN_TOKEN:
         logger.error("Snippet administration enabled but SNIPPET_ADMIN_TOKEN is not set.")
-        return False, (jsonify({"error": "Server misconfiguration"}), 500)
+        return False, json_response({"error": "Server misconfiguration"}, 500)
 
     provided_token = request.headers.get("X-Admin-Token")
     if not provided_token or not compare_digest(provided_token, SNIPPET_ADMIN_TOKEN):
         logger.warning(
             "Unauthorized snippet admin request from %s", request.remote_addr
         )
-        return False, (jsonify({"error": "Unauthorized"}), 401)
+        return False, json_response({"error": "Unauthorized"}, 401)
 
     return True, None
 
+# Prepared statements kept per connection (the sqlite3 module's internal cache)
+SQLITE_CACHED_STATEMENTS = 256
+# Page size used when the phrase database is created (read-mostly, long text rows)
+SQLITE_PAGE_SIZE = 8192
+
+# PRAGMAs applied once to every persistent per-thread SQLite connection
+SQLITE_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=67108864",  # 64 MiB: serve reads from the OS page cache instead of read() calls
+)
+# Read-only connections cannot switch journal_mode; WAL persists in the file once a writer sets it
+SQLITE_READONLY_PRAGMAS = tuple(
+    pragma for pragma in SQLITE_CONNECTION_PRAGMAS if not pragma.startswith("PRAGMA journal_mode")
+)
+
 # --- Snippet Server (Flask App on port 5000) ---
 snippet_app = Flask(__name__)
 SNIPPET_DATABASE = 'snippets.db'
+if FLASK_COMPRESS_AVAILABLE:
+    Compress(snippet_app)
+
+def json_response(data, status=200):
+    """Build a Flask JSON response without going through jsonify."""
+    return snippet_app.response_class(dumps_json_bytes(data), status=status, mimetype='application/json')
+
+def conditional_response(response):
+    """Tag a response with a content ETag and turn it into a 304 if the client already has it."""
+    response.add_etag()
+    return response.make_conditional(request)
+
+def parse_json_body():
+    """Parse the request body as a JSON object without Flask's get_json."""
+    raw = request.get_data(cache=False)
+    try:
+        data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+    except ValueError:
+        return None, json_response({"error": "Invalid JSON body"}, 400)
+    if not isinstance(data, dict):
+        return None, json_response({"error": "JSON body must be an object"}, 400)
+    # Non-string values would fail at the SQLite bind (500) or be stored as some other type
+    if any(key in data and not isinstance(data[key], str) for key in ('abbreviation', 'phrase')):
+        return None, json_response({"error": "Abbreviation and phrase must be strings"}, 400)
+    return data, None
+
+_snippet_tls = local()
 
 def get_snippet_db_connection():
-    """Create a database connection for snippets."""
-    conn = sqlite3.connect(SNIPPET_DATABASE)
-    conn.row_factory = sqlite3.Row
+    """Return this worker thread's snippets connection, opening and tuning it on first use."""
+    conn = getattr(_snippet_tls, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(SNIPPET_DATABASE, cached_statements=SQLITE_CACHED_STATEMENTS)
+        for pragma in SQLITE_CONNECTION_PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.Error:
+                logger.warning("Could not apply %s on %s", pragma, SNIPPET_DATABASE)
+        conn.row_factory = sqlite3.Row
+        _snippet_tls.conn = conn
     return conn
 
+@snippet_app.teardown_appcontext
+def finish_snippet_transaction(exception=None):
+    """Commit (or roll back) pending work; the connection itself stays open for reuse."""
+    conn = getattr(_snippet_tls, 'conn', None)
+    if conn is not None and conn.in_transaction:
+        if exception is None:
+            conn.commit()
+        else:
+            conn.rollback()
+
 def init_snippet_db():
     """Initialize the snippets database and create tables if they don't exist."""
     with snippet_app.app_context():
@@ -111,30 +233,57 @@ def init_snippet_db():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        # Covering index: abbreviation lookups and list reads never touch the table (id is the rowid)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_snippets_abbr_cover
+            ON snippets (abbreviation, phrase, usage_count)
+        ''')
         conn.commit()
-        conn.close()
         logger.info("Snippet database initialized at %s", SNIPPET_DATABASE)
 
+# Change counter for long-polling clients (per process; gunicorn workers each keep their own)
+SNIPPET_EVENTS_TIMEOUT = 30
+# Each waiting client holds a worker thread for up to SNIPPET_EVENTS_TIMEOUT seconds. Cap them at half
+# the pool so regular snippet (and, under run_all_servers, medical API) requests always get a thread;
+# clients over the cap get 204 immediately and retry after their back-off delay.
+SNIPPET_EVENTS_MAX_WAITERS = max(1, SNIPPET_SERVER_THREADS // 2)
+_snippet_version = 0
+_snippet_waiters = 0
+_snippet_version_changed = Condition()
+
+def bump_snippet_version():
+    """Signal long-polling clients that the snippet table changed."""
+    global _snippet_version
+    with _snippet_version_changed:
+        _snippet_version += 1
+        _snippet_version_changed.notify_all()
+
 @snippet_app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for snippet server."""
-    return jsonify({"status": "healthy", "timestamp": datetime.datetime.now().isoformat()})
+    return json_response({"status": "healthy", "timestamp": datetime.datetime.now().isoformat()})
 
 @snippet_app.route('/snippets', methods=['GET'])
 def get_snippets():
     """Get all snippets for the expander client."""
-    conn = get_snippet_db_connection()
-    snippets = conn.execute('SELECT abbreviation, phrase FROM snippets').fetchall()
-    conn.close()
-    return jsonify({row['abbreviation']: row['phrase'] for row in snippets})
+    # Plain (abbreviation, phrase) tuples go straight into dict() without a Row or comprehension per snippet
+    cursor = get_snippet_db_connection().cursor()
+    cursor.row_factory = None
+    snippets = dict(cursor.execute('SELECT abbreviation, phrase FROM snippets'))
+    return conditional_response(json_response(snippets))
 
 @snippet_app.route('/snippets/all', methods=['GET'])
 def get_all_snippets_full():
     """Get all snippets with full details for the manager GUI."""
     conn = get_snippet_db_connection()
-    snippets = conn.execute('SELECT id, abbreviation, phrase, usage_count FROM snippets').fetchall()
-    conn.close()
-    return jsonify([dict(row) for row in snippets])
+    snippets = conn.execute('SELECT id, abbreviation, phrase, usage_count FROM snippets ORDER BY id').fetchall()
+    snippets = [dict(row) for row in snippets]
+    if MSGSPEC_AVAILABLE and MSGPACK_MIMETYPE in request.headers.get('Accept', ''):
+        response = snippet_app.response_class(msgspec.msgpack.encode(snippets), mimetype=MSGPACK_MIMETYPE)
+    else:
+        response = json_response(snippets)
+    response.vary.add('Accept')
+    return conditional_response(response)
 
 @snippet_app.route('/snippets', methods=['POST'])
 def create_snippet():
@@ -143,20 +292,60 @@ def create_snippet():
     if not is_allowed:
         return response
 
-    data = request.get_json()
+    data, error_response = parse_json_body()
+    if error_response:
+        return error_response
     if not data or 'abbreviation' not in data or 'phrase' not in data:
-        return jsonify({"error": "Missing abbreviation or phrase"}), 400
+        return json_response({"error": "Missing abbreviation or phrase"}, 400)
 
     conn = get_snippet_db_connection()
     try:
         conn.execute('INSERT INTO snippets (abbreviation, phrase) VALUES (?, ?)', (data['abbreviation'], data['phrase']))
         conn.commit()
     except sqlite3.IntegrityError:
-        return jsonify({"error": "Abbreviation already exists"}), 409
-    finally:
-        conn.close()
+        conn.rollback()
+        return json_response({"error": "Abbreviation already exists"}, 409)
+    bump_snippet_version()
     logger.info("Snippet created: %s", data['abbreviation'])
-    return jsonify({"message": "Snippet created successfully"}), 201
+    return json_response({"message": "Snippet created successfully"}, 201)
+
+def bulk_create_snippets(items):
+    """Insert (abbreviation, phrase) pairs in one transaction, skipping existing abbreviations.
+
+    Returns the number of snippets actually inserted.
+    """
+    conn = get_snippet_db_connection()
+    with conn:
+        cursor = conn.executemany('INSERT OR IGNORE INTO snippets (abbreviation, phrase) VALUES (?, ?)', items)
+    return cursor.rowcount
+
+@snippet_app.route('/snippets/bulk', methods=['POST'])
+def create_snippets_bulk():
+    """Create many snippets at once: {"snippets": [{"abbreviation": ..., "phrase": ...}, ...]}."""
+    is_allowed, response = require_snippet_admin()
+    if not is_allowed:
+        return response
+
+    data, error_response = parse_json_body()
+    if error_response:
+        return error_response
+    snippets = data.get('snippets')
+    if not isinstance(snippets, list):
+        return json_response({"error": "Missing snippets list"}, 400)
+    try:
+        # itemgetter pulls both keys in one C call per snippet
+        items = list(map(itemgetter('abbreviation', 'phrase'), snippets))
+    except (TypeError, KeyError):
+        return json_response({"error": "Each snippet needs abbreviation and phrase"}, 400)
+    # Non-string values would fail at the SQLite bind and lose the whole batch with a 500
+    if not all(isinstance(abbreviation, str) and isinstance(phrase, str) for abbreviation, phrase in items):
+        return json_response({"error": "Abbreviation and phrase must be strings"}, 400)
+
+    created = bulk_create_snippets(items)
+    if created:
+        bump_snippet_version()
+    logger.info("Bulk snippet create: %s of %s inserted", created, len(items))
+    return json_response({"created": created, "skipped": len(items) - created}, 201)
 
 @snippet_app.route('/snippets/<path:abbreviation>', methods=['PUT'])
 def update_snippet(abbreviation):
@@ -165,16 +354,18 @@ def update_snippet(abbreviation):
     if not is_allowed:
         return response
 
-    data = request.get_json()
+    data, error_response = parse_json_body()
+    if error_response:
+        return error_response
     if not data or 'phrase' not in data:
-        return jsonify({"error": "Missing phrase"}), 400
+        return json_response({"error": "Missing phrase"}, 400)
 
     conn = get_snippet_db_connection()
     conn.execute('UPDATE snippets SET phrase = ? WHERE abbreviation = ?', (data['phrase'], abbreviation))
     conn.commit()
-    conn.close()
+    bump_snippet_version()
     logger.info("Snippet updated: %s", abbreviation)
-    return jsonify({"message": "Snippet updated successfully"})
+    return json_response({"message": "Snippet updated successfully"})
 
 @snippet_app.route('/snippets/<path:abbreviation>', methods=['DELETE'])
 def delete_snippet(abbreviation):
@@ -186,93 +377,297 @@ def delete_snippet(abbreviation):
     conn = get_snippet_db_connection()
     conn.execute('DELETE FROM snippets WHERE abbreviation = ?', (abbreviation,))
     conn.commit()
-    conn.close()
+    bump_snippet_version()
     logger.info("Snippet deleted: %s", abbreviation)
-    return jsonify({"message": "Snippet deleted successfully"})
+    return json_response({"message": "Snippet deleted successfully"})
+
+@snippet_app.route('/snippets/events', methods=['GET'])
+def snippet_events():
+    """Long-poll until the snippet version differs from ?since= (or the timeout expires).
+
+    Returns 204 without waiting when SNIPPET_EVENTS_MAX_WAITERS clients are already parked.
+    """
+    global _snippet_waiters
+    since = request.args.get('since', type=int)
+    with _snippet_version_changed:
+        if since is not None and _snippet_version == since:
+            if _snippet_waiters >= SNIPPET_EVENTS_MAX_WAITERS:
+                return snippet_app.response_class(status=204)
+            _snippet_waiters += 1
+            try:
+                _snippet_version_changed.wait_for(lambda: _snippet_version != since, timeout=SNIPPET_EVENTS_TIMEOUT)
+            finally:
+                _snippet_waiters -= 1
+        version = _snippet_version
+    return json_response({"version": version})
 
 # --- End of Snippet Server ---
 
 
+# Limite de entradas no cache de respostas JSON (categorias/subcategorias/frases)
+JSON_CACHE_MAX_ENTRIES = 256
+
+# Validade dos caches em memória (mesmo valor do max-age enviado aos clientes)
+CACHE_TTL_SECONDS = 60
+
+# Colunas devolvidas pela API de frases (na ordem do esquema), em vez de SELECT *
+FRASES_FIELDS = ("id", "nome", "conteudo", "categoria_principal", "subcategoria", "ordem")
+FRASES_COLUMNS = ", ".join(FRASES_FIELDS)
+
+# Texto SQL fixo por consulta: o cache de statements do sqlite3 é indexado pelo texto exato
+SQL_CATEGORIAS = "SELECT DISTINCT categoria_principal FROM frases"
+SQL_SUBCATEGORIAS = "SELECT DISTINCT subcategoria FROM frases WHERE categoria_principal = ? ORDER BY subcategoria"
+SQL_FRASES_ALL = f"SELECT {FRASES_COLUMNS} FROM frases ORDER BY categoria_principal, subcategoria, ordem"
+SQL_FRASES_CAT = f"SELECT {FRASES_COLUMNS} FROM frases WHERE categoria_principal = ? ORDER BY subcategoria, ordem"
+SQL_FRASES_CAT_SUB = f"SELECT {FRASES_COLUMNS} FROM frases WHERE categoria_principal = ? AND subcategoria = ? ORDER BY ordem"
+
+# Scripts que já abrem a própria transação (ex.: saída de `sqlite3 .dump`); mesma regra de load_snippets.py
+SQL_SCRIPT_BEGIN_RE = re.compile(r"^\s*BEGIN\b", re.IGNORECASE | re.MULTILINE)
+
+# Incrementar quando verify_database passar a corrigir algo novo (invalida os marcadores .verified)
+DATABASE_CHECKS_VERSION = 4
+
+# Conexões ociosas mantidas no pool do banco de frases (uma por requisição simultânea)
+SQLITE_POOL_SIZE = 8
+
+
 class MedicalAutomationServer:
+    # Caminhos já resolvidos, compartilhados entre instâncias do mesmo processo
+    _resolved_db_paths = {}
+
     def __init__(self, db_path=None):
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.db_path = self.resolve_database_path(db_path)
+        self._json_cache = {}
+        self._category_cache = {}
+        self._caches_started_at = time.monotonic()
+        # LIFO: a conexão devolvida por último (com o cache de páginas mais quente) é a próxima a sair
+        self._pool = queue.LifoQueue(maxsize=SQLITE_POOL_SIZE)
+        # No máximo SQLITE_POOL_SIZE consultas simultâneas: o pool sempre comporta as conexões abertas
+        self._pool_slots = BoundedSemaphore(SQLITE_POOL_SIZE)
+        # Verdadeiro se não foi possível gravar as quebras de linha reais: query_frases corrige na leitura
+        self._unescape_newlines = False
         self.verify_database()
 
-    def resolve_database_path(self, preferred_path):
-        """Determina o caminho do banco considerando múltiplas possibilidades."""
-        candidates = []
+    def open_connection(self, readonly=True):
+        """Abrir e ajustar uma nova conexão SQLite (utilizável por qualquer thread do pool).
+
+        As conexões do pool são somente leitura (URI ``mode=ro``); apenas a manutenção
+        de inicialização usa ``readonly=False`` através de ``write_connection``.
+        """
+        if readonly:
+            target, pragmas = Path(self.db_path).resolve().as_uri() + "?mode=ro", SQLITE_READONLY_PRAGMAS
+        else:
+            target, pragmas = self.db_path, SQLITE_CONNECTION_PRAGMAS
+        conn = sqlite3.connect(
+            target,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=SQLITE_CACHED_STATEMENTS,
+            uri=readonly,
+        )
+        for pragma in pragmas:
+            try:
+                conn.execute(pragma)
+            except sqlite3.Error:
+                logger.warning("Could not apply %s on %s", pragma, self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Emprestar uma conexão do pool; ela volta ao pool ao sair do bloco."""
+        with self._pool_slots:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                conn = self.open_connection()
+            try:
+                yield conn
+            finally:
+                self._pool.put_nowait(conn)
+
+    @contextmanager
+    def write_connection(self):
+        """Conexão de escrita de curta duração, fora do pool de leitura."""
+        conn = self.open_connection(readonly=False)
+        try:
+            yield conn
+        finally:
+            conn.close()
 
-        # Ordem de preferência: argumento explícito, variáveis de ambiente e caminhos padrões.
-        if preferred_path:
-            candidates.append(preferred_path)
+    def close_connections(self):
+        """Fechar todas as conexões ociosas do pool."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
 
-        env_candidates = [
-            os.environ.get("AUTOMATION_DB_PATH"),
-            os.environ.get("DB_PATH"),
-        ]
-        candidates.extend(filter(None, env_candidates))
+    def _database_path_candidates(self, preferred_path):
+        """Gerar caminhos candidatos (ainda não normalizados) em ordem de preferência."""
+        # Ordem de preferência: argumento explícito, variáveis de ambiente e caminhos padrões.
+        yield preferred_path
+        yield os.environ.get("AUTOMATION_DB_PATH")
+        yield os.environ.get("DB_PATH")
 
         # Caminhos relativos ao arquivo atual e ao diretório pai (para execução fora do repo).
         script_dir = self.base_dir
         parent_dir = os.path.dirname(script_dir)
-        default_locations = [
-            os.path.join(script_dir, "automation.db"),
-            os.path.join(script_dir, "database", "automation.db"),
-            os.path.join(parent_dir, "automation.db"),
-            os.path.join(parent_dir, "database", "automation.db"),
-        ]
-        candidates.extend(default_locations)
+        yield os.path.join(script_dir, "automation.db")
+        yield os.path.join(script_dir, "database", "automation.db")
+        yield os.path.join(parent_dir, "automation.db")
+        yield os.path.join(parent_dir, "database", "automation.db")
 
-        normalized = []
+    def resolve_database_path(self, preferred_path):
+        """Determina o caminho do banco considerando múltiplas possibilidades."""
+        cache_key = (
+            preferred_path,
+            os.environ.get("AUTOMATION_DB_PATH"),
+            os.environ.get("DB_PATH"),
+            self.base_dir,
+        )
+        cached = self._resolved_db_paths.get(cache_key)
+        # Reaproveitar enquanto o arquivo escolhido continuar existindo
+        if cached is not None and os.path.exists(cached):
+            return cached
+
+        resolved = self._resolve_database_path(preferred_path)
+        self._resolved_db_paths[cache_key] = resolved
+        return resolved
+
+    def _resolve_database_path(self, preferred_path):
+        first_candidate = None
         seen = set()
-        for path in candidates:
+        for path in self._database_path_candidates(preferred_path):
             if not path:
                 continue
             full_path = os.path.abspath(os.path.expanduser(path))
-            if full_path not in seen:
-                normalized.append(full_path)
-                seen.add(full_path)
-
-        if not normalized:
-            return os.path.join(script_dir, "automation.db")
-
-        for path in normalized:
-            if os.path.exists(path):
-                return path
+            if full_path in seen:
+                continue
+            seen.add(full_path)
+            if first_candidate is None:
+                first_candidate = full_path
+            # Parar no primeiro caminho existente sem normalizar os demais
+            if os.path.exists(full_path):
+                return full_path
 
         # Nenhum caminho existente encontrado: usar o primeiro candidato para tentar criar o banco.
-        return normalized[0]
-
-    def verify_database(self, rebuilt=False):
-        """Verificar se banco de dados existe e tem dados"""
-        if not os.path.exists(self.db_path):
-            logger.warning("Database not found at %s", self.db_path)
-            logger.info("Attempting automatic creation from SQL reference file...")
-            if self.bootstrap_database(overwrite=False):
-                self.verify_database(rebuilt=True)
-                return
-            logger.error("Unable to locate or create database at %s", self.db_path)
-            sys.exit(1)
+        return first_candidate
+
+    def verify_database(self):
+        """Verificar se banco de dados existe e tem dados (reconstruindo-o no máximo uma vez)"""
+        if self.database_unchanged_since_verify():
+            logger.info("Database OK at %s (unchanged since last verification)", self.db_path)
+            return
+
+        for attempt in range(2):
+            rebuilt = attempt > 0
+            if not os.path.exists(self.db_path):
+                logger.warning("Database not found at %s", self.db_path)
+                if not rebuilt:
+                    logger.info("Attempting automatic creation from SQL reference file...")
+                    if self.bootstrap_database(overwrite=False):
+                        continue
+                logger.error("Unable to locate or create database at %s", self.db_path)
+                sys.exit(1)
 
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.execute("SELECT COUNT(*) FROM frases")
-            count = cursor.fetchone()[0]
-            conn.close()
-            if count == 0:
+            try:
+                # EXISTS para na primeira linha; COUNT(*) percorreria a tabela inteira
+                with self.connection() as conn:
+                    has_rows = conn.execute("SELECT EXISTS(SELECT 1 FROM frases LIMIT 1)").fetchone()[0]
+            except Exception:
+                logger.exception("Database error while verifying %s", self.db_path)
                 if not rebuilt and self.bootstrap_database(overwrite=True):
-                    self.verify_database(rebuilt=True)
-                    return
-                logger.warning("Database at %s is empty", self.db_path)
+                    continue
+                sys.exit(1)
+
+            if has_rows:
+                approx = self.approximate_frase_count()
+                if approx is None:
+                    logger.info("Database OK at %s", self.db_path)
+                else:
+                    logger.info("Database OK at %s with ~%s entries", self.db_path, approx)
+                self.ensure_indexes()
+                if self.normalize_escaped_newlines():
+                    self.mark_database_verified()
+            elif not rebuilt and self.bootstrap_database(overwrite=True):
+                continue
             else:
-                logger.info("Database OK at %s with %s entries", self.db_path, count)
-        except Exception as e:
-            logger.exception("Database error while verifying %s", self.db_path)
-            if not rebuilt and self.bootstrap_database(overwrite=True):
-                self.verify_database(rebuilt=True)
-                return
-            sys.exit(1)
+                logger.warning("Database at %s is empty", self.db_path)
+            return
+
+    def approximate_frase_count(self):
+        """Número aproximado de frases lido de sqlite_stat1 (gerado por ANALYZE), sem varrer a tabela."""
+        try:
+            with self.connection() as conn:
+                row = conn.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = 'frases' LIMIT 1"
+                ).fetchone()
+            return int(row[0].split()[0]) if row else None
+        except (sqlite3.Error, ValueError, IndexError):
+            return None
+
+    def verified_marker_path(self):
+        """Arquivo ao lado do banco com o mtime da última verificação bem-sucedida."""
+        return self.db_path + ".verified"
+
+    def verified_stamp(self):
+        """Conteúdo do marcador: versão das verificações + mtime atual do banco."""
+        return f"{DATABASE_CHECKS_VERSION}:{os.path.getmtime(self.db_path)!r}"
+
+    def database_unchanged_since_verify(self):
+        """Comparar o mtime atual do banco com o registrado na última verificação (um stat, sem abrir o SQLite)."""
+        try:
+            with open(self.verified_marker_path(), "r", encoding="utf-8") as f:
+                return f.read() == self.verified_stamp()
+        except OSError:
+            return False
+
+    def mark_database_verified(self):
+        """Registrar o mtime atual do banco para pular a verificação na próxima inicialização."""
+        try:
+            with open(self.verified_marker_path(), "w", encoding="utf-8") as f:
+                f.write(self.verified_stamp())
+        except OSError:
+            logger.warning("Could not write verification marker for %s", self.db_path)
+
+    def normalize_escaped_newlines(self):
+        """Gravar quebras de linha reais no lugar de '\\n' escapado, para que a leitura não precise corrigir nada.
+
+        Retorna False se o UPDATE falhar (ex.: banco somente leitura); nesse caso query_frases
+        volta a converter o conteúdo a cada leitura e o banco não é marcado como verificado.
+        """
+        try:
+            with self.write_connection() as conn:
+                cursor = conn.execute(
+                    "UPDATE frases SET conteudo = replace(conteudo, '\\n', char(10)) "
+                    "WHERE instr(conteudo, '\\n') > 0"
+                )
+            if cursor.rowcount:
+                logger.info("Converted escaped newlines in %s phrases", cursor.rowcount)
+        except sqlite3.Error:
+            logger.warning("Could not normalize escaped newlines in %s; converting them on read", self.db_path)
+            self._unescape_newlines = True
+            return False
+        self._unescape_newlines = False
+        return True
+
+    def ensure_indexes(self):
+        """Criar o índice composto usado pelos filtros e ordenações de frases e atualizar estatísticas."""
+        try:
+            with self.write_connection() as conn:
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_frases_catsub "
+                    "ON frases (categoria_principal, subcategoria, ordem)"
+                )
+                # Prefixos de idx_frases_catsub: redundantes, só custariam manutenção a cada escrita
+                conn.execute("DROP INDEX IF EXISTS idx_categoria_subcategoria")
+                conn.execute("DROP INDEX IF EXISTS idx_categoria_principal")
+                # Só roda ANALYZE onde o planejador realmente se beneficiaria (ex.: índice recém-criado)
+                conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            logger.warning("Could not create idx_frases_catsub on %s", self.db_path)
 
     def bootstrap_database(self, overwrite=False):
         """Cria o banco a partir de um arquivo SQL se disponível."""
@@ -290,8 +685,13 @@ class MedicalAutomationServer:
                 return False
 
         if overwrite and os.path.exists(self.db_path):
+            self.close_connections()
             try:
                 os.remove(self.db_path)
+                # Arquivos WAL antigos não podem ser reaplicados sobre o banco recriado
+                for suffix in ("-wal", "-shm"):
+                    if os.path.exists(self.db_path + suffix):
+                        os.remove(self.db_path + suffix)
             except OSError as err:
                 logger.exception("Failed to remove old database at %s", self.db_path)
                 return False
@@ -301,7 +701,14 @@ class MedicalAutomationServer:
                 with open(sql_path, "r", encoding="utf-8") as sql_file:
                     script = sql_file.read()
                 with sqlite3.connect(self.db_path) as conn:
+                    # Só tem efeito antes da primeira tabela; o arquivo aqui é sempre novo
+                    conn.execute(f"PRAGMA page_size={SQLITE_PAGE_SIZE}")
+                    # Uma única transação evita um commit (e um fsync) por INSERT do script
+                    if not SQL_SCRIPT_BEGIN_RE.search(script):
+                        script = f"BEGIN;\n{script}\nCOMMIT;"
                     conn.executescript(script)
+                    # Estatísticas para o planejador e para a contagem aproximada em verify_database
+                    conn.execute("ANALYZE frases")
                 logger.info("Database created at %s from %s", self.db_path, sql_path)
                 return True
             except Exception as err:
@@ -311,8 +718,14 @@ class MedicalAutomationServer:
 
     def find_sql_candidates(self):
         """Retorna possíveis caminhos de arquivos SQL para popular o banco."""
+        return list(self._sql_candidates_for(self.base_dir))
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _sql_candidates_for(base_dir):
+        """Procura (uma vez por diretório) os arquivos SQL de referência existentes."""
         candidates = []
-        locations = [self.base_dir, os.path.dirname(self.base_dir)]
+        locations = [base_dir, os.path.dirname(base_dir)]
         file_names = [
             "SQL2.sql",
             "database.sql",
@@ -337,15 +750,19 @@ class MedicalAutomationServer:
             seen.add(full_path)
             if os.path.exists(full_path):
                 existing.append(full_path)
-        return existing
+        return tuple(existing)
 
     def get_categorias_principais(self):
         """Buscar categorias principais"""
+        self.expire_stale_caches()
+        cached = self._category_cache.get(None)
+        if cached is not None:
+            return list(cached)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.execute("SELECT DISTINCT categoria_principal FROM frases")
-            categorias = [row[0] for row in cursor]
-            conn.close()
+            with self.connection() as conn:
+                categorias = [row[0] for row in conn.execute(SQL_CATEGORIAS)]
+            if categorias:
+                self._category_cache[None] = tuple(categorias)
             return categorias
         except Exception as e:
             logger.exception("Failed to fetch categories")
@@ -353,14 +770,18 @@ class MedicalAutomationServer:
 
     def get_subcategorias(self, categoria_principal):
         """Buscar subcategorias de uma categoria"""
+        self.expire_stale_caches()
+        cached = self._category_cache.get(categoria_principal)
+        if cached is not None:
+            return list(cached)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.execute(
-                "SELECT DISTINCT subcategoria FROM frases WHERE categoria_principal = ? ORDER BY subcategoria",
-                (categoria_principal,)
-            )
-            subcategorias = [row[0] for row in cursor]
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.execute(SQL_SUBCATEGORIAS, (categoria_principal,))
+                subcategorias = [row[0] for row in cursor]
+            if subcategorias:
+                if len(self._category_cache) >= JSON_CACHE_MAX_ENTRIES:
+                    self._category_cache.clear()
+                self._category_cache[categoria_principal] = tuple(subcategorias)
             return subcategorias
         except Exception as e:
             logger.exception("Failed to fetch subcategories for %s", categoria_principal)
@@ -369,42 +790,132 @@ class MedicalAutomationServer:
     def get_frases(self, categoria_principal=None, subcategoria=None):
         """Buscar frases com filtros opcionais"""
         try:
-            conn = sqlite3.connect(self.db_path)
             if categoria_principal and subcategoria:
-                cursor = conn.execute(
-                    "SELECT * FROM frases WHERE categoria_principal = ? AND subcategoria = ? ORDER BY ordem",
-                    (categoria_principal, subcategoria)
-                )
+                return self.query_frases(SQL_FRASES_CAT_SUB, (categoria_principal, subcategoria))
             elif categoria_principal:
-                cursor = conn.execute(
-                    "SELECT * FROM frases WHERE categoria_principal = ? ORDER BY subcategoria, ordem",
-                    (categoria_principal,)
-                )
+                return self.query_frases(SQL_FRASES_CAT, (categoria_principal,))
             else:
-                cursor = conn.execute("SELECT * FROM frases ORDER BY categoria_principal, subcategoria, ordem")
-            frases = []
-            for row in cursor:
-                conteudo = row[2]
-                if isinstance(conteudo, str):
-                    conteudo = conteudo.replace("\\n", "\n")
-                frases.append({
-                    'id': row[0],
-                    'nome': row[1],
-                    'conteudo': conteudo,
-                    'categoria_principal': row[3],
-                    'subcategoria': row[4],
-                    'ordem': row[5]
-                })
-            conn.close()
-            return frases
+                return self.query_frases(SQL_FRASES_ALL)
         except Exception as e:
             logger.exception("Failed to fetch phrases")
             return []
 
+    def query_frases(self, sql, params=()):
+        """Executar uma consulta (que seleciona FRASES_COLUMNS) e devolver dicts"""
+        # Tuplas simples desempacotadas por posição: sem sqlite3.Row nem description por consulta
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(sql, params).fetchall()
+        frases = []
+        append = frases.append
+        unescape = self._unescape_newlines
+        # Mesma ordem de FRASES_FIELDS; normalmente as quebras de linha já vêm corretas (normalize_escaped_newlines)
+        for id_, nome, conteudo, categoria, subcategoria, ordem in rows:
+            if unescape and type(conteudo) is str and "\\n" in conteudo:
+                conteudo = conteudo.replace("\\n", "\n")
+            append({
+                "id": id_,
+                "nome": nome,
+                "conteudo": conteudo,
+                "categoria_principal": categoria,
+                "subcategoria": subcategoria,
+                "ordem": ordem,
+            })
+        return frases
+
+    def get_cached_json(self, kind, key=None):
+        """Retorna (bytes JSON, ETag) de categorias, subcategorias ou frases, com cache em memória."""
+        self.expire_stale_caches()
+        cache_key = (kind, key)
+        cached = self._json_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if kind == 'categorias':
+            data = self.get_categorias_principais()
+        elif kind == 'subcategorias':
+            data = self.get_subcategorias(key)
+        else:
+            data = self.get_frases(*key)
+        body = dumps_json_bytes(data)
+        entry = (body, '"{}"'.format(hashlib.sha1(body).hexdigest()))
+
+        # Listas vazias podem indicar falha de leitura; não fixá-las no cache.
+        if data:
+            if len(self._json_cache) >= JSON_CACHE_MAX_ENTRIES:
+                self._json_cache.clear()
+            self._json_cache[cache_key] = entry
+        return entry
+
+    def invalidate_json_cache(self):
+        """Descartar respostas em cache (chamar após alterar a tabela frases)."""
+        self._json_cache.clear()
+
+    def invalidate_category_cache(self):
+        """Descartar categorias/subcategorias memorizadas e as respostas derivadas delas."""
+        self._category_cache.clear()
+        self.invalidate_json_cache()
+        self._caches_started_at = time.monotonic()
+
+    def expire_stale_caches(self):
+        """Esvaziar os caches após CACHE_TTL_SECONDS, para refletir edições externas no banco."""
+        if time.monotonic() - self._caches_started_at > CACHE_TTL_SECONDS:
+            self.invalidate_category_cache()
+
+# Rotas da API compiladas uma única vez: (padrão, nome do método do handler)
+def _api_categorias(automation_server, match, query):
+    return 200, automation_server.get_cached_json('categorias')
+
+def _api_subcategorias(automation_server, match, query):
+    categoria = urllib.parse.unquote(match.group('categoria').strip('/'))
+    if not categoria:
+        return 400, "Categoria não especificada"
+    return 200, automation_server.get_cached_json('subcategorias', categoria)
+
+def _api_frases(automation_server, match, query):
+    params = {}
+    if query:
+        try:
+            params = dict(urllib.parse.parse_qsl(query, max_num_fields=8))
+        except ValueError:
+            return 400, "Parâmetros inválidos"
+    key = (params.get('categoria'), params.get('subcategoria'))
+    return 200, automation_server.get_cached_json('frases', key)
+
+API_ROUTES = (
+    (re.compile(r'^/api/categorias/*$'), _api_categorias),
+    # Categoria vazia casa de propósito: o handler responde 400 "Categoria não especificada"
+    (re.compile(r'^/api/subcategorias/(?P<categoria>.*)$'), _api_subcategorias),
+    # Como antes, qualquer /api/frases/<...> também devolve as frases
+    (re.compile(r'^/api/frases(/.*)?$'), _api_frases),
+)
+
+def dispatch_api(automation_server, path, query):
+    """Resolver uma rota /api/* comum ao WebRequestHandler e ao blueprint Flask.
+
+    ``path`` ainda percent-encoded, como na linha de requisição. Retorna None se nenhuma
+    rota casar, (200, (body, etag)) em caso de sucesso ou (status, mensagem) em caso de erro.
+    """
+    for pattern, handler in API_ROUTES:
+        match = pattern.match(path)
+        if match:
+            return handler(automation_server, match, query)
+    return None
+
 class WebRequestHandler(BaseHTTPRequestHandler):
-    def __init__(self, *args, automation_server=None, **kwargs):
-        self.automation_server = automation_server
-        super().__init__(*args, **kwargs)
+    # Todas as respostas enviam Content-Length, permitindo conexões keep-alive
+    protocol_version = 'HTTP/1.1'
+    # Fecha conexões keep-alive ociosas, para que clientes parados não prendam threads indefinidamente
+    timeout = 15
+    # wfile com buffer: status, cabeçalhos e corpo saem juntos no flush feito ao fim de cada requisição
+    wbufsize = -1
+
+    # Interface HTML pré-codificada, preenchida ao iniciar o servidor
+    _html_payloads = None
+
+    # MedicalAutomationServer compartilhado, definido na subclasse criada por run_medical_server
+    automation_server = None
 
     def log_message(self, format, *args):
         """Suprimir logs desnecessarios"""
@@ -413,34 +924,18 @@ class WebRequestHandler(BaseHTTPRequestHandler):
     def do_GET(self):
         """Processar requisicoes GET"""
         try:
-            parsed_url = urllib.parse.urlparse(self.path)
-            path = parsed_url.path
+            # A request-target de origem é sempre "caminho[?query]"; partition evita o urlparse completo
+            path, _, query = self.path.partition('?')
 
             # API routes
-            if path.startswith('/api/'):
-                path_parts = path.strip('/').split('/')
-                
-                if len(path_parts) == 2 and path_parts[1] == 'categorias':
-                    categorias = self.automation_server.get_categorias_principais()
-                    self.send_json_response(categorias)
-                    return
-
-                if len(path_parts) >= 3 and path_parts[1] == 'subcategorias':
-                    categoria = urllib.parse.unquote('/'.join(path_parts[2:]))
-                    if not categoria:
-                        self.send_error(400, "Categoria não especificada")
-                        return
-                    subcategorias = self.automation_server.get_subcategorias(categoria)
-                    self.send_json_response(subcategorias)
-                    return
-
-                if len(path_parts) >= 2 and path_parts[1] == 'frases':
-                    query_params = urllib.parse.parse_qs(parsed_url.query)
-                    categoria = query_params.get('categoria', [None])[0]
-                    subcategoria = query_params.get('subcategoria', [None])[0]
-                    frases = self.automation_server.get_frases(categoria, subcategoria)
-                    self.send_json_response(frases)
-                    return
+            result = dispatch_api(self.automation_server, path, query)
+            if result is not None:
+                status, payload = result
+                if status == 200:
+                    self.send_cached_json_response(*payload)
+                else:
+                    self.send_error(status, payload)
+                return
 
             # Root path for HTML interface
             if path == '/':
@@ -452,34 +947,101 @@ class WebRequestHandler(BaseHTTPRequestHandler):
             logger.exception("Error processing request %s", self.path)
             self.send_error(500, "Erro interno do servidor")
 
-    def send_json_response(self, data):
-        """Enviar resposta JSON"""
+    def send_cached_json_response(self, body, etag):
+        """Enviar JSON pré-serializado com ETag, respondendo 304 se o cliente já o possui"""
         try:
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'max-age=60')
+                self.end_headers()
+                return
+
             self.send_response(200)
             self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
             self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'max-age=60')
             self.end_headers()
-            json_data = json.dumps(data, ensure_ascii=False, indent=2)
-            self.wfile.write(json_data.encode('utf-8'))
+            self.wfile.write(body)
         except Exception as e:
-            logger.exception("Failed to send JSON response")
+            logger.exception("Failed to send cached JSON response")
             self.send_error(500, "Erro ao processar dados")
 
+    @classmethod
+    def get_html_payloads(cls):
+        """Interface HTML em bytes (sem compressão, gzip e brotli) e o ETag de cada codificação, gerados uma única vez"""
+        # O template é embutido (não há arquivo a enviar com os.sendfile); os bytes ficam
+        # em memória e seguem direto para o socket, sem leitura ou encode por requisição.
+        if WebRequestHandler._html_payloads is None:
+            html_bytes = cls.get_html_template().encode('utf-8')
+            payloads = {
+                'identity': html_bytes,
+                'gzip': gzip.compress(html_bytes, compresslevel=9, mtime=0),
+            }
+            if BROTLI_AVAILABLE:
+                payloads['br'] = brotli.compress(html_bytes, quality=11, mode=brotli.MODE_TEXT)
+            # Cada representação tem bytes diferentes, logo precisa de um ETag próprio (sufixo da codificação)
+            digest = hashlib.sha1(html_bytes).hexdigest()
+            payloads['etags'] = {
+                coding: '"{}"'.format(digest if coding == 'identity' else f"{digest}-{coding}")
+                for coding in list(payloads)
+            }
+            WebRequestHandler._html_payloads = payloads
+        return WebRequestHandler._html_payloads
+
+    @staticmethod
+    def select_html_encoding(payloads, accept_encoding):
+        """Escolher br, gzip ou identidade conforme o Accept-Encoding; retorna (codificação ou None, corpo, ETag)"""
+        accepted = set()
+        refused = set()
+        for token in accept_encoding.split(','):
+            coding, _, params = token.partition(';')
+            coding = coding.strip().lower()
+            name, _, weight = params.partition('=')
+            # "q=0" significa recusado; qualquer outro peso conta como aceito
+            if name.strip().lower() == 'q' and weight.strip().rstrip('0').rstrip('.') in ('0', ''):
+                refused.add(coding)
+            else:
+                accepted.add(coding)
+        # "*" aceita qualquer codificação que não tenha sido recusada explicitamente
+        wildcard = '*' in accepted
+        for coding in ('br', 'gzip'):
+            if coding in payloads and (coding in accepted or (wildcard and coding not in refused)):
+                return coding, payloads[coding], payloads['etags'][coding]
+        return None, payloads['identity'], payloads['etags']['identity']
+
     def send_medical_interface(self):
         """Enviar interface HTML"""
-        html_content = self.get_html_template()
         try:
+            encoding, body, etag = self.select_html_encoding(
+                self.get_html_payloads(), self.headers.get('Accept-Encoding', '')
+            )
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                return
+
             self.send_response(200)
             self.send_header('Content-Type', 'text/html; charset=utf-8')
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('ETag', etag)
             self.send_header('Cache-Control', 'no-cache')
             self.end_headers()
-            self.wfile.write(html_content.encode('utf-8'))
+            self.wfile.write(body)
         except Exception as e:
             logger.exception("Failed to send HTML response")
             self.send_error(500, "Erro ao carregar interface")
 
-    def get_html_template(self):
+    @staticmethod
+    def get_html_template():
         """Template HTML completo e funcional"""
         return '''<!DOCTYPE html>
 <html lang="pt-br">
@@ -633,6 +1195,10 @@ class WebRequestHandler(BaseHTTPRequestHandler):
             box-shadow: 0 1px 0 rgba(15, 23, 42, 0.04);
         }
 
+        .list-item[hidden] {
+            display: none;
+        }
+
         .list-item:hover,
         .list-item:focus {
             outline: none;
@@ -944,36 +1510,64 @@ class WebRequestHandler(BaseHTTPRequestHandler):
             const refreshButton = document.getElementById('refresh-data');
             const quickActionsContainer = document.getElementById('quick-actions');
 
-            const quickPhrases = [
+            const quickPhrases = Object.freeze([
                 { label: 'Bom dia', text: 'Bom dia, tudo bem? Qual seria a solicitação, por gentileza?' },
                 { label: 'Boa tarde', text: 'Boa tarde, tudo bem? Qual seria a solicitação, por gentileza?' },
                 { label: 'Boa noite', text: 'Boa noite, tudo bem? Qual seria a solicitação, por gentileza?' },
                 { label: 'Encerramento', text: 'Disponha! Bom plantão!' },
                 { label: 'Início TeleAVC', text: 'Bom dia! Me chamo Alessandra Morais, neurologista do programa TeleAVC. Estou disponível hoje das 07h às 19h. Bom plantão a todos!' }
-            ];
+            ]);
 
-            function escapeHTML(value) {
-                if (value == null) {
-                    return '';
+            // Separa os campos no texto de busca para que um termo não case atravessando dois campos
+            const SEARCH_FIELD_SEPARATOR = String.fromCharCode(1);
+
+            // Respostas da API por URL; os dados mudam pouco durante a sessão e "Recarregar" limpa o cache
+            const apiCache = new Map();
+
+            async function cachedJSON(url) {
+                if (apiCache.has(url)) {
+                    return apiCache.get(url);
                 }
-                const stringValue = String(value);
-                const replacements = {
-                    '&': '&amp;',
-                    '<': '&lt;',
-                    '>': '&gt;',
-                    '"': '&quot;',
-                    "'": '&#39;'
-                };
-                let result = '';
-                for (let index = 0; index < stringValue.length; index += 1) {
-                    const character = stringValue[index];
-                    if (Object.prototype.hasOwnProperty.call(replacements, character)) {
-                        result += replacements[character];
-                    } else {
-                        result += character;
-                    }
+                const response = await fetch(url);
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                const data = await response.json();
+                apiCache.set(url, data);
+                return data;
+            }
+
+            // Renderizações pedidas no mesmo evento (clique, resposta da API) saem juntas no próximo quadro
+            let pendingRenders = new Set();
+            let renderFrame = 0;
+
+            function scheduleRender(render) {
+                pendingRenders.add(render);
+                if (!renderFrame) {
+                    renderFrame = requestAnimationFrame(() => {
+                        const renders = pendingRenders;
+                        pendingRenders = new Set();
+                        renderFrame = 0;
+                        renders.forEach(run => run());
+                    });
                 }
-                return result;
+            }
+
+            // Adia a chamada até que o usuário pare de digitar por `wait` ms
+            function debounce(fn, wait) {
+                let timer = null;
+                const debounced = (...args) => {
+                    clearTimeout(timer);
+                    timer = setTimeout(() => {
+                        timer = null;
+                        fn(...args);
+                    }, wait);
+                };
+                debounced.cancel = () => {
+                    clearTimeout(timer);
+                    timer = null;
+                };
+                return debounced;
             }
 
             function setStatus(message, isError = false) {
@@ -988,7 +1582,28 @@ class WebRequestHandler(BaseHTTPRequestHandler):
             }
 
             function renderEmptyState(element, text) {
-                element.innerHTML = `<div class="empty-state">${text}</div>`;
+                const emptyState = document.createElement('div');
+                emptyState.className = 'empty-state';
+                emptyState.textContent = text;
+                element.replaceChildren(emptyState);
+            }
+
+            // Botão de lista com título (e subtítulo opcional); textContent dispensa escapar HTML
+            function createListItem(title, subtitle) {
+                const button = document.createElement('button');
+                button.type = 'button';
+                button.className = 'list-item';
+                const titleSpan = document.createElement('span');
+                titleSpan.className = 'list-item-title';
+                titleSpan.textContent = title;
+                button.appendChild(titleSpan);
+                if (subtitle !== undefined) {
+                    const subtitleSpan = document.createElement('span');
+                    subtitleSpan.className = 'list-item-subtitle';
+                    subtitleSpan.textContent = subtitle;
+                    button.appendChild(subtitleSpan);
+                }
+                return button;
             }
 
             function renderCategories() {
@@ -997,15 +1612,12 @@ class WebRequestHandler(BaseHTTPRequestHandler):
                     return;
                 }
 
-                categoryList.innerHTML = '';
+                const fragment = document.createDocumentFragment();
                 state.categories.forEach(category => {
-                    const button = document.createElement('button');
-                    button.type = 'button';
-                    button.className = 'list-item';
+                    const button = createListItem(category);
                     if (category === state.selectedCategory) {
                         button.classList.add('active');
                     }
-                    button.innerHTML = `<span class="list-item-title">${escapeHTML(category)}</span>`;
                     button.addEventListener('click', () => {
                         if (state.selectedCategory !== category) {
                             state.selectedCategory = category;
@@ -1014,14 +1626,15 @@ class WebRequestHandler(BaseHTTPRequestHandler):
                             state.subcategories = [];
                             state.phrases = [];
                             phrasePreview.value = '';
-                            phraseList.innerHTML = '';
-                            renderCategories();
+                            phraseList.replaceChildren();
+                            scheduleRender(renderCategories);
                             renderEmptyState(subcategoryList, 'Carregando subcategorias…');
                             loadSubcategories(category);
                         }
                     });
-                    categoryList.appendChild(button);
+                    fragment.appendChild(button);
                 });
+                categoryList.replaceChildren(fragment);
             }
 
             function renderSubcategories() {
@@ -1031,27 +1644,56 @@ class WebRequestHandler(BaseHTTPRequestHandler):
                     return;
                 }
 
-                subcategoryList.innerHTML = '';
+                const fragment = document.createDocumentFragment();
                 state.subcategories.forEach(subcategory => {
-                    const button = document.createElement('button');
-                    button.type = 'button';
-                    button.className = 'list-item';
+                    const button = createListItem(subcategory);
                     if (subcategory === state.selectedSubcategory) {
                         button.classList.add('active');
                     }
-                    button.innerHTML = `<span class="list-item-title">${escapeHTML(subcategory)}</span>`;
                     button.addEventListener('click', () => {
                         if (state.selectedSubcategory !== subcategory) {
                             state.selectedSubcategory = subcategory;
                             state.selectedPhraseId = null;
                             phrasePreview.value = '';
-                            renderSubcategories();
+                            scheduleRender(renderSubcategories);
                             renderEmptyState(phraseList, 'Carregando frases…');
                             loadPhrases(state.selectedCategory, subcategory);
                         }
                     });
-                    subcategoryList.appendChild(button);
+                    fragment.appendChild(button);
+                });
+                subcategoryList.replaceChildren(fragment);
+            }
+
+            // Botões da lista de frases atual: criados uma vez por carga e reaproveitados pelos filtros
+            const phraseButtons = new Map();
+            let renderedPhrases = null;
+            const noMatchesState = document.createElement('div');
+            noMatchesState.className = 'empty-state';
+            noMatchesState.textContent = 'Nenhuma frase corresponde à pesquisa.';
+
+            function buildPhraseButtons() {
+                phraseButtons.clear();
+                const fragment = document.createDocumentFragment();
+                state.phrases.forEach(phrase => {
+                    const button = createListItem(phrase.nome, phrase.subcategoria || state.selectedSubcategory);
+                    button.addEventListener('click', () => {
+                        state.selectedPhraseId = phrase.id;
+                        phrasePreview.value = phrase.conteudo;
+                        scheduleRender(renderPhrases);
+                    });
+                    button.addEventListener('dblclick', async () => {
+                        state.selectedPhraseId = phrase.id;
+                        phrasePreview.value = phrase.conteudo;
+                        await copyToClipboard(phrase.conteudo);
+                        scheduleRender(renderPhrases);
+                    });
+                    phraseButtons.set(phrase.id, button);
+                    fragment.appendChild(button);
                 });
+                fragment.appendChild(noMatchesState);
+                phraseList.replaceChildren(fragment);
+                renderedPhrases = state.phrases;
             }
 
             function renderPhrases() {
@@ -1063,51 +1705,27 @@ class WebRequestHandler(BaseHTTPRequestHandler):
                     return;
                 }
 
+                // Recriar os botões só quando a lista muda ou foi substituída por outro conteúdo
+                if (renderedPhrases !== state.phrases || noMatchesState.parentNode !== phraseList) {
+                    buildPhraseButtons();
+                }
+
+                // Filtrar apenas mostra/oculta os botões existentes, sem criar elementos
                 const query = phraseSearch.value.trim().toLowerCase();
-                const filtered = state.phrases.filter(phrase => {
-                    if (!query) {
-                        return true;
+                let shown = 0;
+                state.phrases.forEach(phrase => {
+                    const matches = !query || phrase._searchBlob.indexOf(query) !== -1;
+                    const button = phraseButtons.get(phrase.id);
+                    button.hidden = !matches;
+                    button.classList.toggle('active', phrase.id === state.selectedPhraseId);
+                    if (matches) {
+                        shown += 1;
                     }
-                    return (
-                        phrase.nome.toLowerCase().includes(query) ||
-                        (phrase.subcategoria && phrase.subcategoria.toLowerCase().includes(query)) ||
-                        phrase.conteudo.toLowerCase().includes(query)
-                    );
                 });
 
                 phraseCount.textContent = state.phrases.length.toString();
-                filterCount.textContent = query ? `${filtered.length} exibidas` : '';
-
-                if (!filtered.length) {
-                    renderEmptyState(phraseList, 'Nenhuma frase corresponde à pesquisa.');
-                    return;
-                }
-
-                phraseList.innerHTML = '';
-                filtered.forEach(phrase => {
-                    const button = document.createElement('button');
-                    button.type = 'button';
-                    button.className = 'list-item';
-                    if (phrase.id === state.selectedPhraseId) {
-                        button.classList.add('active');
-                    }
-                    button.innerHTML = `
-                        <span class="list-item-title">${escapeHTML(phrase.nome)}</span>
-                        <span class="list-item-subtitle">${escapeHTML(phrase.subcategoria || state.selectedSubcategoria || '')}</span>
-                    `;
-                    button.addEventListener('click', () => {
-                        state.selectedPhraseId = phrase.id;
-                        phrasePreview.value = phrase.conteudo;
-                        renderPhrases();
-                    });
-                    button.addEventListener('dblclick', async () => {
-                        state.selectedPhraseId = phrase.id;
-                        phrasePreview.value = phrase.conteudo;
-                        await copyToClipboard(phrase.conteudo);
-                        renderPhrases();
-                    });
-                    phraseList.appendChild(button);
-                });
+                filterCount.textContent = query ? `${shown} exibidas` : '';
+                noMatchesState.hidden = shown > 0;
             }
 
             async function copyToClipboard(text) {
@@ -1139,18 +1757,14 @@ class WebRequestHandler(BaseHTTPRequestHandler):
             async function loadCategories() {
                 setStatus('Carregando categorias…');
                 try {
-                    const response = await fetch('/api/categorias');
-                    if (!response.ok) {
-                        throw new Error(`HTTP ${response.status}`);
-                    }
-                    const data = await response.json();
+                    const data = await cachedJSON('/api/categorias');
                     state.categories = Array.isArray(data) ? data : [];
                     if (!state.categories.length) {
                         setStatus('Nenhuma categoria cadastrada.', true);
                     } else {
                         setStatus('Categorias carregadas com sucesso.');
                     }
-                    renderCategories();
+                    scheduleRender(renderCategories);
                 } catch (error) {
                     console.error('Erro ao carregar categorias', error);
                     setStatus('Erro ao carregar categorias.', true);
@@ -1163,36 +1777,50 @@ class WebRequestHandler(BaseHTTPRequestHandler):
                     return;
                 }
                 try {
-                    const response = await fetch(`/api/subcategorias/${encodeURIComponent(category)}`);
-                    if (!response.ok) {
-                        throw new Error(`HTTP ${response.status}`);
-                    }
-                    const data = await response.json();
+                    const data = await cachedJSON(`/api/subcategorias/${encodeURIComponent(category)}`);
                     state.subcategories = Array.isArray(data) ? data : [];
-                    renderSubcategories();
+                    scheduleRender(renderSubcategories);
                 } catch (error) {
                     console.error('Erro ao carregar subcategorias', error);
                     renderEmptyState(subcategoryList, 'Erro ao carregar subcategorias.');
                 }
             }
 
+            // URL de /api/frases por par (categoria, subcategoria), montada e codificada uma única vez
+            const phrasesURLs = new Map();
+            const URL_KEY_SEPARATOR = String.fromCharCode(0);
+
+            function phrasesURL(category, subcategory) {
+                const key = category + URL_KEY_SEPARATOR + (subcategory || '');
+                let url = phrasesURLs.get(key);
+                if (url === undefined) {
+                    const params = new URLSearchParams({ categoria: category });
+                    if (subcategory) {
+                        params.set('subcategoria', subcategory);
+                    }
+                    url = `/api/frases?${params.toString()}`;
+                    phrasesURLs.set(key, url);
+                }
+                return url;
+            }
+
             async function loadPhrases(category, subcategory) {
                 if (!category) {
                     return;
                 }
                 try {
-                    const params = new URLSearchParams();
-                    params.set('categoria', category);
-                    if (subcategory) {
-                        params.set('subcategoria', subcategoria);
-                    }
-                    const response = await fetch(`/api/frases?${params.toString()}`);
-                    if (!response.ok) {
-                        throw new Error(`HTTP ${response.status}`);
-                    }
-                    const data = await response.json();
+                    const data = await cachedJSON(phrasesURL(category, subcategory));
                     state.phrases = Array.isArray(data) ? data : [];
-                    renderPhrases();
+                    // Texto de busca em minúsculas calculado uma vez por lista, não a cada tecla
+                    state.phrases.forEach(phrase => {
+                        if (phrase._searchBlob === undefined) {
+                            phrase._searchBlob = [phrase.nome, phrase.subcategoria, phrase.conteudo]
+                                .map(field => field || '')
+                                .join(SEARCH_FIELD_SEPARATOR)
+                                .toLowerCase();
+                        }
+                    });
+                    scheduleRender(renderPhrases);
                 } catch (error) {
                     console.error('Erro ao carregar frases', error);
                     renderEmptyState(phraseList, 'Erro ao carregar frases.');
@@ -1200,42 +1828,59 @@ class WebRequestHandler(BaseHTTPRequestHandler):
             }
 
             function setupQuickActions() {
-                quickActionsContainer.innerHTML = '';
+                const fragment = document.createDocumentFragment();
                 quickPhrases.forEach((item, index) => {
                     const button = document.createElement('button');
                     button.type = 'button';
                     button.className = 'secondary';
-                    button.innerHTML = `${index + 1}. ${escapeHTML(item.label)}`;
+                    button.textContent = `${index + 1}. ${item.label}`;
                     button.addEventListener('click', () => {
                         phrasePreview.value = item.text;
                         state.selectedPhraseId = null;
                         copyToClipboard(item.text);
                     });
-                    quickActionsContainer.appendChild(button);
+                    fragment.appendChild(button);
                 });
+                quickActionsContainer.replaceChildren(fragment);
             }
 
-            phraseSearch.addEventListener('input', () => renderPhrases());
+            const SEARCH_DEBOUNCE_MS = 160;
+            const renderPhrasesDebounced = debounce(renderPhrases, SEARCH_DEBOUNCE_MS);
+
+            phraseSearch.addEventListener('input', () => renderPhrasesDebounced());
+            phraseSearch.addEventListener('keydown', event => {
+                if (event.key === 'Enter') {
+                    renderPhrasesDebounced.cancel();
+                    renderPhrases();
+                }
+            });
 
             copyButton.addEventListener('click', () => {
                 copyToClipboard(phrasePreview.value);
             });
 
             refreshButton.addEventListener('click', () => {
+                renderPhrasesDebounced.cancel();
                 state.selectedCategory = null;
                 state.selectedSubcategory = null;
                 state.selectedPhraseId = null;
                 state.subcategories = [];
                 state.phrases = [];
                 phrasePreview.value = '';
-                subcategoryList.innerHTML = '';
-                phraseList.innerHTML = '';
+                subcategoryList.replaceChildren();
+                phraseList.replaceChildren();
+                apiCache.clear();
                 loadCategories();
             });
 
             document.addEventListener('keydown', event => {
-                if ((event.metaKey || event.ctrlKey) && /^[1-5]$/.test(event.key)) {
-                    const index = Number(event.key) - 1;
+                // Caminho rápido: sem Ctrl/Cmd (digitação comum) nada mais é avaliado
+                if (!(event.metaKey || event.ctrlKey) || !event.key || event.key.length !== 1) {
+                    return;
+                }
+                const code = event.key.charCodeAt(0);
+                if (code >= 49 && code <= 53) { // '1'..'5'
+                    const index = code - 49;
                     const quick = quickPhrases[index];
                     if (quick) {
                         event.preventDefault();
@@ -1254,16 +1899,103 @@ class WebRequestHandler(BaseHTTPRequestHandler):
 </html>'''
 
 
+# --- Medical API Blueprint (same routes as WebRequestHandler, for WSGI deployments) ---
+# Read-only /api/* routes, also mounted on the snippet app (port 5000)
+medical_api_bp = Blueprint('medical_api', __name__)
+# HTML interface and cache invalidation: medical port (8080) only
+medical_bp = Blueprint('medical', __name__)
+_medical_server = None
+
+def get_medical_server():
+    """Return the shared MedicalAutomationServer, creating it on first use."""
+    global _medical_server
+    if _medical_server is None:
+        db_path = os.environ.get('AUTOMATION_DB_PATH') or os.environ.get('DB_PATH')
+        _medical_server = MedicalAutomationServer(db_path=db_path)
+    return _medical_server
+
+def cached_json_response(body, etag):
+    """Flask counterpart of WebRequestHandler.send_cached_json_response."""
+    if request.headers.get('If-None-Match') == etag:
+        response = snippet_app.response_class(status=304)
+    else:
+        response = snippet_app.response_class(body, mimetype='application/json')
+        response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'max-age=60'
+    return response
+
+@medical_api_bp.route('/api/<path:subpath>', methods=['GET'], merge_slashes=False)
+def api_get(subpath):
+    """Phrase API (categorias, subcategorias, frases), resolved by the same dispatch_api as the raw handler."""
+    # dispatch_api expects the path as it appeared on the request line, i.e. still percent-encoded
+    path = urllib.parse.quote(request.path, safe='/')
+    result = dispatch_api(get_medical_server(), path, request.query_string.decode('latin-1'))
+    if result is None:
+        abort(404)
+    status, payload = result
+    if status != 200:
+        abort(status, description=payload)
+    return cached_json_response(*payload)
+
+@medical_bp.route('/api/cache/invalidate', methods=['POST'])
+def api_cache_invalidate():
+    """Drop cached categories and phrase responses after editing the phrases database."""
+    is_allowed, response = require_snippet_admin()
+    if not is_allowed:
+        return response
+    get_medical_server().invalidate_category_cache()
+    return json_response({"message": "Cache invalidated"})
+
+@medical_bp.route('/', methods=['GET'])
+def medical_interface():
+    """Serve the phrase browser interface."""
+    encoding, body, etag = WebRequestHandler.select_html_encoding(
+        WebRequestHandler.get_html_payloads(), request.headers.get('Accept-Encoding', '')
+    )
+    if request.headers.get('If-None-Match') == etag:
+        response = snippet_app.response_class(status=304)
+    else:
+        response = snippet_app.response_class(body, mimetype='text/html')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# The snippet app also answers the read-only phrase API, e.g. gunicorn -w 4 -k gthread server:snippet_app;
+# the HTML interface and /api/cache/invalidate stay on the medical port
+snippet_app.register_blueprint(medical_api_bp)
+
+# Full medical server (API, interface, cache invalidation), for the port-8080 listener
+medical_app = Flask(__name__)
+medical_app.register_blueprint(medical_api_bp)
+medical_app.register_blueprint(medical_bp)
+
+def dispatch_by_port(environ, start_response):
+    """Send requests that arrived on port 8080 to medical_app and the rest to snippet_app."""
+    app = medical_app if environ.get('SERVER_PORT') == '8080' else snippet_app
+    return app(environ, start_response)
+
+# --- End of Medical API Blueprint ---
+
+
 def run_medical_server(db_path):
     """Runs the medical phrases server on port 8080."""
     automation_server = MedicalAutomationServer(db_path=db_path)
 
-    class CustomWebRequestHandler(WebRequestHandler):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, automation_server=automation_server, **kwargs)
+    # Atributo de classe: nenhum __init__ extra nem kwargs montados a cada conexão
+    CustomWebRequestHandler = type(
+        'CustomWebRequestHandler', (WebRequestHandler,), {'automation_server': automation_server}
+    )
+
+    # Pré-carregar a interface HTML antes de aceitar conexões
+    WebRequestHandler.get_html_payloads()
 
     server_address = ('', 8080)
-    httpd = HTTPServer(server_address, CustomWebRequestHandler)
+    # Uma thread por conexão: uma consulta lenta não bloqueia os demais clientes
+    httpd = ThreadingHTTPServer(server_address, CustomWebRequestHandler)
     logger.info("Medical phrases server running on http://localhost:8080")
     httpd.serve_forever()
 
@@ -1271,16 +2003,29 @@ def run_snippet_server():
     """Runs the snippet server on port 5000."""
     init_snippet_db()
     logger.info("Snippet server ready on http://localhost:5000")
+    if WAITRESS_AVAILABLE:
+        # Each waitress worker thread keeps its own snippets connection (WAL: concurrent readers)
+        logger.info("Serving snippet app with waitress (%s threads)", SNIPPET_SERVER_THREADS)
+        waitress.serve(snippet_app, host='127.0.0.1', port=5000, threads=SNIPPET_SERVER_THREADS)
+        return
     logger.warning(
-        "Do not use the built-in Flask server in production. Use Gunicorn or another WSGI server."
+        "Do not use the built-in Flask server in production. Install waitress or use Gunicorn."
     )
     logger.info("Production example: gunicorn -w 4 -b 0.0.0.0:5000 server:snippet_app")
-    # snippet_app.run(host='0.0.0.0', port=5000, threaded=True)  # Somente para desenvolvimento
-    snippet_app.run(host='127.0.0.1', port=5000)
+    snippet_app.run(host='127.0.0.1', port=5000, threaded=True)
 def run_all_servers():
     db_path = os.environ.get('AUTOMATION_DB_PATH') or os.environ.get('DB_PATH')
     logger.info("Starting medical automation services")
 
+    if WAITRESS_AVAILABLE:
+        # One waitress event loop listens on both ports; no extra thread just to host the medical server
+        init_snippet_db()
+        get_medical_server()
+        WebRequestHandler.get_html_payloads()
+        logger.info("Serving snippets on http://localhost:5000 and medical phrases on http://localhost:8080")
+        waitress.serve(dispatch_by_port, listen='127.0.0.1:5000 0.0.0.0:8080', threads=SNIPPET_SERVER_THREADS)
+        return
+
     # Run medical server in a background thread
     medical_thread = Thread(target=run_medical_server, args=(db_path,), daemon=True)
     medical_thread.start()
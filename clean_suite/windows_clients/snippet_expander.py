@@ -87,16 +87,23 @@ class PhraseSelector(tk.Toplevel):
         # Sort phrases by subcategory and then by order
         filtered_phrases.sort(key=lambda p: (p.get('subcategoria', ''), p.get('ordem', 0)))
 
+        lines = []
+        header_indices = []
         last_subcategory = None
         for p in filtered_phrases:
             # Add a subcategory header if it changes
             subcategory = p.get('subcategoria', 'Uncategorized')
             if subcategory != last_subcategory:
-                self.phrase_list.insert(tk.END, f"--- {subcategory} ---")
-                self.phrase_list.itemconfig(tk.END, {'fg': 'grey'}) # Make header distinct
+                header_indices.append(len(lines))
+                lines.append(f"--- {subcategory} ---")
                 last_subcategory = subcategory
             
-            self.phrase_list.insert(tk.END, f"  {p.get('nome', 'Unnamed Phrase')}")
+            lines.append(f"  {p.get('nome', 'Unnamed Phrase')}")
+
+        # Insert every row in a single Tcl call, then style the headers
+        self.phrase_list.insert(tk.END, *lines)
+        for index in header_indices:
+            self.phrase_list.itemconfig(index, {'fg': 'grey'}) # Make header distinct
     
     def filter_phrases(self, event=None):
         """Filter the phrases in the listbox based on search entry."""
@@ -127,6 +134,7 @@ class SnippetExpander:
     def __init__(self):
         self.kb_controller = keyboard.Controller()
         self.snippets = {}
+        self.snippets_etag = None
         self.buffer = ""
         self.trigger = "//"
         self.is_enabled = True
@@ -138,11 +146,16 @@ class SnippetExpander:
         """Fetch snippets from the server and update local cache."""
         try:
             url = urljoin(SERVER_URL, "snippets")
-            response = requests.get(url, timeout=10)
+            headers = {"If-None-Match": self.snippets_etag} if self.snippets_etag else None
+            response = requests.get(url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                print("Snippets already up to date.")
+                return
             response.raise_for_status()
             self.snippets = response.json()
+            self.snippets_etag = response.headers.get("ETag")
             with open(CACHE_FILE, 'w') as f:
-                json.dump(self.snippets, f)
+                json.dump(self.snippets, f, separators=(',', ':'))
             print("Snippets synced from server.")
         except requests.RequestException as e:
             print(f"Error syncing from server: {e}")
@@ -1,10 +1,34 @@
+import queue
+import threading
+import time
+from functools import lru_cache
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 import requests
 from urllib.parse import urljoin, quote
 
+# Optional: fetch the snippet list as MessagePack instead of JSON
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    msgspec = None
+    MSGSPEC_AVAILABLE = False
+
+MSGPACK_MIMETYPE = "application/x-msgpack"
+
 SERVER_URL = "https://192.168.0.34:5000"
 MEDICAL_SERVER_URL = "https://192.168.0.34:8080"
+RESYNC_DELAY_MS = 500  # Quiet period after edits before re-fetching the full list
+EVENTS_TIMEOUT = 35  # Seconds; a little above the server's 30 s long-poll window
+EVENTS_RETRY_DELAY = 30  # Seconds to wait before re-polling after an error
+EVENTS_POLL_MS = 250  # How often the Tk thread drains change notifications from the listener
+
+@lru_cache(maxsize=512)
+def encode_abbreviation(abbreviation):
+    """Percent-encode an abbreviation for use as a URL path segment."""
+    return quote(abbreviation, safe='')
+
 
 class SnippetManager(tk.Tk):
     def __init__(self):
@@ -13,6 +37,12 @@ class SnippetManager(tk.Tk):
         self.geometry("800x600")
 
         self.snippets = []
+        self._snippets_etag = None
+        self._resync_job = None
+        # Filled by the listener thread, drained on the Tk thread (Tk is not thread-safe)
+        self._change_events = queue.Queue()
+        # Reuse one connection pool (keep-alive) for every call to the servers
+        self.session = requests.Session()
 
         # Menu
         self.create_menu()
@@ -31,11 +61,13 @@ class SnippetManager(tk.Tk):
         tk.Button(btn_frame, text="Edit Snippet", command=self.edit_snippet).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Delete Snippet", command=self.delete_snippet).pack(side=tk.LEFT, padx=5)
 
-        # Snippets list
-        self.listbox = tk.Listbox(main_frame, font=("Consolas", 10))
+        # Snippets list (backed by a Tcl list variable so a refresh is a single set)
+        self.snippet_lines = tk.StringVar(self)
+        self.listbox = tk.Listbox(main_frame, font=("Consolas", 10), listvariable=self.snippet_lines)
         self.listbox.pack(fill=tk.BOTH, expand=True)
         
         self.load_snippets()
+        self.start_event_listener()
 
     def create_menu(self):
         """Creates the application menu."""
@@ -76,21 +108,84 @@ Available Template Variables:
         """Load snippets from the server and populate the listbox."""
         try:
             url = urljoin(SERVER_URL, "snippets/all")
-            response = requests.get(url, timeout=5)
+            headers = {"Accept": MSGPACK_MIMETYPE} if MSGSPEC_AVAILABLE else {}
+            if self._snippets_etag:
+                headers["If-None-Match"] = self._snippets_etag
+            response = self.session.get(url, headers=headers, timeout=5)
+            if response.status_code == 304:
+                return  # Unchanged since the last download
             response.raise_for_status()
-            data = response.json()
+            if response.headers.get("Content-Type", "").startswith(MSGPACK_MIMETYPE):
+                data = msgspec.msgpack.decode(response.content)
+            else:
+                data = response.json()
             if not isinstance(data, list):
                 raise ValueError("Server response is not a list of snippets.")
             self.snippets = data
-
-            self.listbox.delete(0, tk.END)
-            for snippet in self.snippets:
-                abbr = snippet.get('abbreviation', '')
-                phrase = snippet.get('phrase', '')
-                self.listbox.insert(tk.END, f"{abbr:<25} -> {phrase}")
+            self._snippets_etag = response.headers.get("ETag")
+            self.render_snippets()
         except (requests.RequestException, ValueError, KeyError) as e:
             messagebox.showerror("Error", f"Could not load snippets: {e}")
 
+    def render_snippets(self):
+        """Redraw the listbox from the local snippet list."""
+        # Setting the list variable with a tuple replaces every row in one Tcl call;
+        # Tkinter converts the tuple to a properly quoted Tcl list.
+        self.snippet_lines.set(tuple(
+            f"{snippet.get('abbreviation', ''):<25} -> {snippet.get('phrase', '')}"
+            for snippet in self.snippets
+        ))
+
+    def schedule_resync(self):
+        """Re-fetch the full list once edits have been quiet for RESYNC_DELAY_MS."""
+        if self._resync_job is not None:
+            self.after_cancel(self._resync_job)
+        self._resync_job = self.after(RESYNC_DELAY_MS, self._full_resync)
+
+    def _full_resync(self):
+        self._resync_job = None
+        self.load_snippets()
+
+    def start_event_listener(self):
+        """Start the background thread that waits for server-side snippet changes."""
+        threading.Thread(target=self._listen_for_changes, daemon=True).start()
+        self._drain_change_events()
+
+    def _drain_change_events(self):
+        """Runs on the Tk thread: schedule a resync for any changes the listener reported."""
+        changed = False
+        while True:
+            try:
+                self._change_events.get_nowait()
+            except queue.Empty:
+                break
+            changed = True
+        if changed:
+            self.schedule_resync()
+        self.after(EVENTS_POLL_MS, self._drain_change_events)
+
+    def _listen_for_changes(self):
+        """Long-poll /snippets/events and queue a notification whenever the version changes."""
+        session = requests.Session()  # Sessions are not shared across threads
+        url = urljoin(SERVER_URL, "snippets/events")
+        version = None
+        while True:
+            try:
+                params = {"since": version} if version is not None else None
+                response = session.get(url, params=params, timeout=EVENTS_TIMEOUT)
+                response.raise_for_status()
+                if response.status_code == 204:
+                    # Server is at its long-poll limit; back off instead of re-polling immediately
+                    time.sleep(EVENTS_RETRY_DELAY)
+                    continue
+                new_version = response.json()["version"]
+            except (requests.RequestException, ValueError, KeyError, TypeError):
+                time.sleep(EVENTS_RETRY_DELAY)
+                continue
+            if version is not None and new_version != version:
+                self._change_events.put(new_version)
+            version = new_version
+
     def add_snippet(self):
         """Show dialog to add a new snippet."""
         abbr = simpledialog.askstring("Add Snippet", "Enter abbreviation:")
@@ -101,8 +196,10 @@ Available Template Variables:
 
         try:
             url = urljoin(SERVER_URL, "snippets")
-            requests.post(url, json={"abbreviation": abbr, "phrase": phrase}, timeout=5).raise_for_status()
-            self.load_snippets()
+            self.session.post(url, json={"abbreviation": abbr, "phrase": phrase}, timeout=5).raise_for_status()
+            self.snippets.append({"abbreviation": abbr, "phrase": phrase})
+            self.render_snippets()
+            self.schedule_resync()
         except requests.RequestException as e:
             messagebox.showerror("Error", f"Failed to add snippet: {e}")
 
@@ -114,7 +211,7 @@ Available Template Variables:
         # Fetch categories to show as options
         try:
             url = urljoin(MEDICAL_SERVER_URL, "api/categorias")
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             response.raise_for_status()
             categories = response.json()
             if not isinstance(categories, list):
@@ -132,8 +229,10 @@ Available Template Variables:
 
         try:
             url = urljoin(SERVER_URL, "snippets")
-            requests.post(url, json={"abbreviation": abbr, "phrase": phrase}, timeout=5).raise_for_status()
-            self.load_snippets()
+            self.session.post(url, json={"abbreviation": abbr, "phrase": phrase}, timeout=5).raise_for_status()
+            self.snippets.append({"abbreviation": abbr, "phrase": phrase})
+            self.render_snippets()
+            self.schedule_resync()
         except requests.RequestException as e:
             messagebox.showerror("Error", f"Failed to add snippet: {e}")
 
@@ -154,10 +253,12 @@ Available Template Variables:
         if not new_phrase: return
 
         try:
-            encoded_abbr = quote(snippet['abbreviation'], safe='')
+            encoded_abbr = encode_abbreviation(snippet['abbreviation'])
             url = urljoin(SERVER_URL, f"snippets/{encoded_abbr}")
-            requests.put(url, json={"phrase": new_phrase}, timeout=5).raise_for_status()
-            self.load_snippets()
+            self.session.put(url, json={"phrase": new_phrase}, timeout=5).raise_for_status()
+            snippet['phrase'] = new_phrase
+            self.render_snippets()
+            self.schedule_resync()
         except requests.RequestException as e:
             messagebox.showerror("Error", f"Failed to edit snippet: {e}")
 
@@ -168,10 +269,12 @@ Available Template Variables:
 
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete '{snippet['abbreviation']}'?"):
             try:
-                encoded_abbr = quote(snippet['abbreviation'], safe='')
+                encoded_abbr = encode_abbreviation(snippet['abbreviation'])
                 url = urljoin(SERVER_URL, f"snippets/{encoded_abbr}")
-                requests.delete(url, timeout=5).raise_for_status()
-                self.load_snippets()
+                self.session.delete(url, timeout=5).raise_for_status()
+                self.snippets.remove(snippet)
+                self.render_snippets()
+                self.schedule_resync()
             except requests.RequestException as e:
                 messagebox.showerror("Error", f"Failed to delete snippet: {e}")
 
@@ -184,8 +287,7 @@ Available Template Variables:
         tk.Label(dialog, text=prompt, wraplength=330).pack(pady=10)
         
         listbox = tk.Listbox(dialog)
-        for option in options:
-            listbox.insert(tk.END, option)
+        listbox.insert(tk.END, *options)  # One Tcl call for all rows
         listbox.pack(fill=tk.BOTH, expand=True, padx=10)
 
         result = {"value": None}
@@ -12,6 +12,7 @@ This script will:
 - Execute all statements in the provided SQL file (includes DELETE + INSERTs)
 """
 import os
+import re
 import sys
 import sqlite3
 import argparse
@@ -27,8 +28,29 @@ CREATE TABLE IF NOT EXISTS snippets (
     usage_count INTEGER DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS idx_snippets_abbr_cover
+    ON snippets (abbreviation, phrase, usage_count);
 """
 
+# Durability is relaxed only while the bulk load runs; restored afterwards
+BULK_LOAD_PRAGMAS = (
+    "PRAGMA synchronous=OFF",
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA temp_store=MEMORY",
+)
+RESTORE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA journal_mode=WAL",
+)
+
+
+def wrap_in_transaction(sql_script):
+    """Wrap the script in BEGIN/COMMIT unless it already manages its own transaction."""
+    if re.search(r"^\s*BEGIN\b", sql_script, re.IGNORECASE | re.MULTILINE):
+        return sql_script
+    return "BEGIN;\n" + sql_script + "\nCOMMIT;\n"
+
+
 def main():
     parser = argparse.ArgumentParser(description="Populate snippets.db from SQL file")
     parser.add_argument("--db", default=DEFAULT_DB, help="Path to snippets.db (default: snippets.db)")
@@ -52,7 +74,16 @@ def main():
             # Apply data script
             with open(sql_path, "r", encoding="utf-8") as f:
                 sql_script = f.read()
-            conn.executescript(sql_script)
+            for pragma in BULK_LOAD_PRAGMAS:
+                conn.execute(pragma)
+            try:
+                # One transaction means one journal flush instead of one per INSERT
+                conn.executescript(wrap_in_transaction(sql_script))
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                for pragma in RESTORE_PRAGMAS:
+                    conn.execute(pragma)
         print(f"✓ Loaded data from {sql_path} into {db_path}")
     except Exception as e:
         print(f"ERROR applying SQL: {e}")
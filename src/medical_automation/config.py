@@ -3,6 +3,7 @@ Configuration management for Medical Automation Suite.
 Supports multiple environments (development, production) and uses environment variables.
 """
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, TYPE_CHECKING
 from dotenv import load_dotenv
@@ -63,12 +64,15 @@ class Config:
     SNIPPET_ADMIN_TOKEN: str = os.getenv("SNIPPET_ADMIN_TOKEN", "")
     SNIPPET_ADMIN_HEADER: str = os.getenv("SNIPPET_ADMIN_HEADER", "X-Admin-Token")
 
+    # URLs are memoized per server_ip; ports and default IP are fixed at import.
     @classmethod
+    @lru_cache(maxsize=16)
     def get_medical_server_url(cls, server_ip: Optional[str] = None) -> str:
         ip = server_ip or cls.DEFAULT_SERVER_IP
         return f"http://{ip}:{cls.MEDICAL_SERVER_PORT}"
 
     @classmethod
+    @lru_cache(maxsize=16)
     def get_snippet_server_url(cls, server_ip: Optional[str] = None) -> str:
         ip = server_ip or cls.DEFAULT_SERVER_IP
         return f"http://{ip}:{cls.SNIPPET_SERVER_PORT}"
@@ -96,6 +100,5 @@ class Config:
 # Select environment (single class; DEBUG toggles stricter checks)
 ENV = os.getenv("ENVIRONMENT", "development").lower()
 
-# Exported config handle
-config = Config()
-config.ensure_directories()
\ No newline at end of file
+# Exported config handle (directories are created by the server entrypoint, not on import)
+config = Config()
\ No newline at end of file
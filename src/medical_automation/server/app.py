@@ -1,14 +1,62 @@
 """Flask application factory for Medical Automation Suite."""
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
 from ..config import config
 from ..utils.logger import setup_logger
 from .routes import medical_bp, snippet_bp
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 logger = setup_logger(__name__, "server.log")
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes jsonify() responses with orjson.
+
+    Dates are passed through to ``self.default`` so they keep Flask's
+    HTTP-date format; calls orjson cannot reproduce (``indent``, ``cls``,
+    ``separators``...) fall back to the default provider.
+    """
+
+    def _orjson_option(self, sort_keys):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+        default = kwargs.pop('default', self.default)
+        if kwargs:
+            return super().dumps(obj, sort_keys=sort_keys, default=default, **kwargs)
+        return orjson.dumps(
+            obj, default=default, option=self._orjson_option(sort_keys)
+        ).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Pretty-printed output (debug mode / compact=False) stays with the default provider
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        # Write orjson's UTF-8 bytes straight into the response body
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._orjson_option(self.sort_keys)),
+            mimetype=self.mimetype,
+        )
+
+
 def create_app(config_override=None):
     """
     Create and configure the Flask application.
@@ -20,9 +68,12 @@ def create_app(config_override=None):
         Configured Flask application instance
     """
     app = Flask(__name__)
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
     
     # Use provided config or default
     app_config = config_override or config
+    app_config.ensure_directories()
     
     # Configure Flask
     app.config['SECRET_KEY'] = app_config.SECRET_KEY
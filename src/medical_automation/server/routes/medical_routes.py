@@ -1,5 +1,8 @@
 """Medical phrases API routes."""
+from typing import Optional
+
 from flask import Blueprint, jsonify, request
+from werkzeug.local import LocalProxy
 
 from ...config import config
 from ...utils.logger import get_logger
@@ -8,8 +11,19 @@ from ...utils.db_manager import DatabaseManager
 logger = get_logger(__name__)
 medical_bp = Blueprint('medical', __name__)
 
-# Initialize database manager
-db = DatabaseManager(config.MEDICAL_DB_PATH, config.MEDICAL_SQL_FILE)
+_db: Optional[DatabaseManager] = None
+
+
+def get_db() -> DatabaseManager:
+    """Return the medical database manager, creating it on first use."""
+    global _db
+    if _db is None:
+        _db = DatabaseManager(config.MEDICAL_DB_PATH, config.MEDICAL_SQL_FILE)
+    return _db
+
+
+# Lazy handle: the database is only opened when a route first needs it
+db = LocalProxy(get_db)
 
 
 @medical_bp.route('/categories', methods=['GET'])
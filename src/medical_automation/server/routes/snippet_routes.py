@@ -1,5 +1,8 @@
 """Snippet expansion API routes."""
+from typing import Optional
+
 from flask import Blueprint, jsonify, request
+from werkzeug.local import LocalProxy
 
 from ...config import config
 from ...utils.logger import get_logger
@@ -8,8 +11,19 @@ from ...utils.db_manager import DatabaseManager
 logger = get_logger(__name__)
 snippet_bp = Blueprint('snippets', __name__)
 
-# Initialize database manager
-db = DatabaseManager(config.SNIPPET_DB_PATH, config.SNIPPET_SQL_FILE)
+_db: Optional[DatabaseManager] = None
+
+
+def get_db() -> DatabaseManager:
+    """Return the snippet database manager, creating it on first use."""
+    global _db
+    if _db is None:
+        _db = DatabaseManager(config.SNIPPET_DB_PATH, config.SNIPPET_SQL_FILE)
+    return _db
+
+
+# Lazy handle: the database is only opened when a route first needs it
+db = LocalProxy(get_db)
 
 
 @snippet_bp.route('/', methods=['GET'])
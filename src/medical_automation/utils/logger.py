@@ -27,16 +27,13 @@ def setup_logger(
     logger = logging.getLogger(name)
     
     # Set log level
+    if isinstance(level, str) and level.strip() == "":
+        raise ValueError("Log level cannot be an empty string.")
     log_level = level or config.LOG_LEVEL
     log_level_upper = log_level.upper()
     if not hasattr(logging, log_level_upper):
         raise ValueError(f"Invalid log level: {log_level}")
     logger.setLevel(getattr(logging, log_level_upper))
-    elif isinstance(level, str) and level.strip() == "":
-        raise ValueError("Log level cannot be an empty string.")
-    else:
-        log_level = level
-    logger.setLevel(getattr(logging, log_level.upper()))
     
     # Remove existing handlers to avoid duplicates
     logger.handlers.clear()
@@ -54,6 +51,7 @@ def setup_logger(
     
     # File handler (if log_file specified)
     if log_file:
+        config.LOGS_DIR.mkdir(parents=True, exist_ok=True)
         log_path = config.LOGS_DIR / log_file
         file_handler = RotatingFileHandler(
             log_path,